@@ -3,17 +3,22 @@ This application's core strength is its ability to create a searchable knowledge
 Which can be incredibly valuable for internal knowledge management.
 """
 
-from src.youtube import search_videos, get_video_details, store_video_details
-from src.vectorstore import process_documents_recursive, process_documents_semantic, create_chroma_vectorstore
+from src.youtube import search_podcasts, get_video_details, store_video_details
+from src.vectorstore import process_documents_recursive, process_documents_semantic, create_chroma_vectorstore, create_faiss_vectorstore
 from src.utils import _format_collection_name
-from src.agent import run_rag_chain
+from src.agent import stream_rag_chain
+from src.embeddings import get_cached_embeddings
 
 # Import all necessary chat model classes
-from langchain_openai import OpenAIEmbeddings, ChatOpenAI
+from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_community.cache import SQLiteCache
+from langchain_core.globals import set_llm_cache
 
 import os
+import logging
+import httpx
 from dotenv import load_dotenv
 import streamlit as st
 from datetime import datetime
@@ -24,9 +29,11 @@ from datetime import datetime
 load_dotenv()  
 
 # --- CONFIGURATION ---
+logging.basicConfig(level=logging.INFO)  # agent debug output stays off unless raised to DEBUG
+logging.getLogger("httpx").setLevel(logging.WARNING)  # - otherwise every OpenAI/embedding request logs a line
 os.environ["LANGCHAIN_TRACING_V2"] = "true"
 os.environ["LANGCHAIN_PROJECT"] = "LangChain-YoutubeScraper"
-EMBEDDING = OpenAIEmbeddings(model="text-embedding-3-small")
+VECTORSTORE_BACKEND = os.environ.get("VECTORSTORE_BACKEND", "chroma")  # "chroma" or "faiss" (needs faiss-cpu)
 
 # Define the list of available models from different providers
 AVAILABLE_MODELS = {
@@ -38,6 +45,46 @@ AVAILABLE_MODELS = {
 MODEL_OPTIONS = [model for provider_models in AVAILABLE_MODELS.values() for model in provider_models]
 
 
+# --- SHARED CLIENTS ---
+# Streamlit re-executes this script on every interaction; cache_resource keeps one instance per process
+@st.cache_resource
+def get_openai_http_client() -> httpx.Client:
+    """One pooled HTTP client shared by every OpenAI model and the embeddings."""
+    return httpx.Client(limits=httpx.Limits(max_connections=100, max_keepalive_connections=20))
+
+@st.cache_resource
+def get_embedding():
+    return get_cached_embeddings(model="text-embedding-3-small", http_client=get_openai_http_client())
+
+@st.cache_resource
+def get_llm(model_name: str):
+    """Build the chat model for `model_name` once; returns None for an unknown model."""
+    if model_name in AVAILABLE_MODELS.get("OpenAI", []):
+        return ChatOpenAI(model=model_name, temperature=0, streaming=True, http_client=get_openai_http_client())
+    if model_name in AVAILABLE_MODELS.get("Anthropic", []):
+        return ChatAnthropic(model=model_name, temperature=0)
+    if model_name in AVAILABLE_MODELS.get("Google", []):
+        return ChatGoogleGenerativeAI(model=model_name, temperature=0, convert_system_message_to_human=True)
+    return None
+
+@st.cache_resource
+def get_llm_cache() -> SQLiteCache:
+    """Exact-match cache for LLM calls; temperature-0 repeats of a prompt skip the API."""
+    os.makedirs("data", exist_ok=True)
+    return SQLiteCache(database_path="data/.llm_cache.sqlite")
+
+EMBEDDING = get_embedding()
+set_llm_cache(get_llm_cache())
+
+@st.cache_resource
+def get_vectorstore(formatted_topic: str, backend: str, video_ids: tuple, _video_df):
+    """Chunk and index a topic's videos once per process; repeating the same search reuses the store."""
+    # - `video_ids` keys the cache so new search results get indexed; the frame itself isn't hashed
+    chunks = process_documents_semantic(video_df=_video_df, embedding_model=EMBEDDING)
+    create_vectorstore = create_faiss_vectorstore if backend == "faiss" else create_chroma_vectorstore
+    return create_vectorstore(chunks, EMBEDDING, topic=formatted_topic)
+
+
 # --- STREAMLIT APP ---
 st.set_page_config(page_title="🎬 Youtube Summarizer", layout="wide")
 st.title("🎬 Youtube Summarizer")
@@ -87,7 +134,7 @@ if not st.session_state.chat_ready:
     if submit_button and topic:
         with st.spinner("Searching YouTube, processing transcripts, and building the RAG assistant..."):
             # GETTING
-            video_ids = search_videos(topic=topic, api_key=os.environ.get('YOUTUBE_API_KEY'), max_results=max_results)
+            video_ids = search_podcasts(topic=topic, api_key=os.environ.get('YOUTUBE_API_KEY'), max_results=max_results)
             video_df = get_video_details(video_ids=video_ids, api_key=os.environ.get('YOUTUBE_API_KEY'))
             
             # STORING
@@ -104,9 +151,7 @@ if not st.session_state.chat_ready:
             st.session_state["video_df_display"] = video_df[["Video Title", "author", "publish_time", "view_count"]]
 
             # - create RAG vectorstore
-            chunks = process_documents_semantic(video_df=video_df, embedding_model=EMBEDDING)
-            formatted_topic = _format_collection_name(topic)
-            st.session_state.vectorstore = create_chroma_vectorstore(chunks, EMBEDDING, topic=formatted_topic)
+            st.session_state.vectorstore = get_vectorstore(_format_collection_name(topic), VECTORSTORE_BACKEND, tuple(video_df["video_id"]), video_df)
 
             st.session_state.chat_ready = True
             st.session_state.messages = [{"role": "ai", "content": f"Hi! I'm ready to answer questions about **{topic}**. Choose your AI model from the sidebar and let's begin!"}]
@@ -150,31 +195,27 @@ if st.session_state.chat_ready:
                 # --- LLM Factory Logic ---
                 try:
                     model_name = st.session_state.selected_model
-                    if model_name in AVAILABLE_MODELS.get("OpenAI", []):
-                        llm = ChatOpenAI(model=model_name, temperature=0, streaming=True)
-                    elif model_name in AVAILABLE_MODELS.get("Anthropic", []):
-                        llm = ChatAnthropic(model=model_name, temperature=0)
-                    elif model_name in AVAILABLE_MODELS.get("Google", []):
-                        llm = ChatGoogleGenerativeAI(model=model_name, temperature=0, convert_system_message_to_human=True)
-                    else:
+                    llm = get_llm(model_name)
+                    if llm is None:
                         st.error(f"Unknown model provider for: {model_name}")
-                        llm = None
                 except Exception as e:
                     st.error(f"Failed to initialize the AI model. Ensure you have the correct API keys set in your .env file. Error: {e}")
                     llm = None
                 # --- End LLM Factory ---
 
                 if llm:
-                    result = run_rag_chain(
-                        query=query,
-                        vectorstore=st.session_state.vectorstore,
-                        chat_history=[{"role": msg["role"], "content": str(msg["content"])} for msg in st.session_state.messages[:-1]],
-                        llm=llm
-                    )
-                    
-                    response_content = result.get("response", "Sorry, I couldn't generate a response.")
-                    st.session_state.messages.append({"role": "ai", "content": response_content})
+                    # - stream tokens into the chat bubble as the model generates them
                     with st.chat_message("ai"):
-                        st.markdown(response_content)
+                        response_content = st.write_stream(stream_rag_chain(
+                            query=query,
+                            vectorstore=st.session_state.vectorstore,
+                            chat_history=[{"role": msg["role"], "content": str(msg["content"])} for msg in st.session_state.messages[:-1]],
+                            llm=llm
+                        ))
+                        # - nothing streamed (e.g. the workflow errored), so show the fallback in this bubble too
+                        if not response_content:
+                            response_content = "Sorry, I couldn't generate a response."
+                            st.markdown(response_content)
+                    st.session_state.messages.append({"role": "ai", "content": response_content})
         else:
             st.error("Error: The vectorstore is not available. Please restart the search.")
@@ -15,10 +15,12 @@ python eval.py --all                             # Evaluate all datasets
 """
 
 import pandas as pd
-import json
+import numpy as np
+import orjson
 import os
 import argparse
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Tuple, Optional
 from src.evaluation import evaluate_transcripts, EvaluationMetrics
 from src.youtube import load_video_details
@@ -39,11 +41,11 @@ class YouTubeDataEvaluator:
             raw_data_path = f"{self.base_path}/raw_data"
             if os.path.exists(raw_data_path):
                 files = os.listdir(raw_data_path)
-                csv_files = [f for f in files if f.endswith('.csv')]
+                data_files = [f for f in files if f.endswith(('.parquet', '.csv'))]
                 
-                for file in csv_files:
-                    # Parse filename: topic_timestamp.csv
-                    name_parts = file.replace('.csv', '').split('_')
+                for file in data_files:
+                    # Parse filename: topic_timestamp.parquet (or .csv for older datasets)
+                    name_parts = os.path.splitext(file)[0].split('_')
                     if len(name_parts) >= 2:
                         topic = '_'.join(name_parts[:-2])
                         timestamp = '_'.join(name_parts[-2:])
@@ -57,7 +59,7 @@ class YouTubeDataEvaluator:
             
         return datasets
     
-    def analyze_dataset(self, topic: str, timestamp: str = None, quality_threshold: int = 3) -> Dict:
+    def analyze_dataset(self, topic: str, timestamp: str = None, quality_threshold: int = 3, max_concurrency: int = 8) -> Dict:
         """Analyze a specific dataset for quality and RAG suitability."""
         
         print(f"\n🔍 ANALYZING DATASET: {topic}")
@@ -78,7 +80,8 @@ class YouTubeDataEvaluator:
             metrics = evaluate_transcripts(
                 df=video_df,
                 quality_threshold=quality_threshold,
-                model_name="gpt-3.5-turbo"
+                model_name="gpt-4o-mini",
+                max_concurrency=max_concurrency
             )
             
             # Analyze content characteristics
@@ -102,6 +105,12 @@ class YouTubeDataEvaluator:
             print(f"❌ {error_msg}")
             return {'error': error_msg}
     
+    def analyze_datasets(self, topics: List[str], quality_threshold: int = 3, max_workers: int = 8, max_concurrency: int = 8) -> Dict[str, Dict]:
+        """Analyze several datasets concurrently; each is dominated by I/O-bound LLM calls."""
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.analyze_dataset, topic, quality_threshold=quality_threshold, max_concurrency=max_concurrency): topic for topic in topics}
+            return {futures[future]: future.result() for future in as_completed(futures)}
+    
     def _analyze_content_characteristics(self, video_df: pd.DataFrame) -> Dict:
         """Analyze content characteristics for RAG suitability."""
         
@@ -114,38 +123,39 @@ class YouTubeDataEvaluator:
             'content_quality_issues': []
         }
         
-        for _, row in video_df.iterrows():
-            transcript = row.get('transcript', '')
-            
-            if pd.notna(transcript):
-                # Analyze transcript length
-                word_count = len(str(transcript).split())
-                analysis['transcript_lengths'].append(word_count)
-                
-                # Check for short content
-                if word_count < 50:
-                    analysis['short_content_count'] += 1
-                    analysis['content_quality_issues'].append({
-                        'video_id': row['video_id'],
-                        'title': row['title'],
-                        'issue': 'Very short transcript',
-                        'word_count': word_count
-                    })
-                
-                # Check for music-heavy content
-                music_mentions = transcript.count('[Music]') + transcript.count('foreign')
-                if music_mentions > 3:
-                    analysis['music_heavy_count'] += 1
-                    analysis['content_quality_issues'].append({
-                        'video_id': row['video_id'],
-                        'title': row['title'],
-                        'issue': 'Music-heavy content',
-                        'music_mentions': music_mentions
-                    })
-                
-                # Channel distribution
-                channel = row.get('author', 'Unknown')
-                analysis['channel_distribution'][channel] = analysis['channel_distribution'].get(channel, 0) + 1
+        # Per-transcript checks as whole-column string ops and boolean masks
+        present = video_df[video_df['transcript'].notna()]
+        transcripts = present['transcript'].astype(str)
+        word_counts = transcripts.str.split().str.len()
+        music_mentions = transcripts.str.count(r'\[Music\]') + transcripts.str.count('foreign')
+        short_mask = word_counts < 50
+        music_mask = music_mentions > 3
+        
+        # Analyze transcript length
+        analysis['transcript_lengths'] = word_counts.tolist()
+        
+        # Check for short content
+        analysis['short_content_count'] = int(short_mask.sum())
+        for row, word_count in zip(present.loc[short_mask].itertuples(), word_counts[short_mask]):
+            analysis['content_quality_issues'].append({
+                'video_id': row.video_id,
+                'title': row.title,
+                'issue': 'Very short transcript',
+                'word_count': int(word_count)
+            })
+        
+        # Check for music-heavy content
+        analysis['music_heavy_count'] = int(music_mask.sum())
+        for row, mentions in zip(present.loc[music_mask].itertuples(), music_mentions[music_mask]):
+            analysis['content_quality_issues'].append({
+                'video_id': row.video_id,
+                'title': row.title,
+                'issue': 'Music-heavy content',
+                'music_mentions': int(mentions)
+            })
+        
+        # Channel distribution
+        analysis['channel_distribution'] = present['author'].value_counts().to_dict()
         
         # Calculate statistics
         if analysis['transcript_lengths']:
@@ -192,20 +202,21 @@ class YouTubeDataEvaluator:
         }
         
         # Add per-video analysis
-        for _, row in video_df.iterrows():
-            video_id = row['video_id']
-            video_analysis = {
-                'video_id': video_id,
-                'title': row['title'],
-                'author': row['author'],
-                'view_count': row['view_count'],
-                'quality_score': metrics.quality_scores.get(video_id, 0),
-                'quality_reason': metrics.quality_reasons.get(video_id, 'N/A'),
-                'transcript_length': len(str(row.get('transcript', '')).split()),
-                'status': 'PASSED' if video_id not in metrics.failed_videos else 'FAILED',
-                'rag_suitable': metrics.quality_scores.get(video_id, 0) >= 3
-            }
-            report['detailed_video_analysis'].append(video_analysis)
+        # - map scores once and gate with vector comparisons instead of per-row dict/list lookups
+        scores = video_df['video_id'].map(metrics.quality_scores).fillna(0).astype('int8')
+        failed = video_df['video_id'].isin(metrics.failed_videos)
+        video_analysis_df = pd.DataFrame({
+            'video_id': video_df['video_id'],
+            'title': video_df['title'],
+            'author': video_df['author'],
+            'view_count': video_df['view_count'],
+            'quality_score': scores,
+            'quality_reason': video_df['video_id'].map(metrics.quality_reasons).fillna('N/A'),
+            'transcript_length': video_df['transcript'].fillna('').astype(str).str.split().str.len(),
+            'status': np.where(failed, 'FAILED', 'PASSED'),
+            'rag_suitable': scores >= 3
+        })
+        report['detailed_video_analysis'] = video_analysis_df.to_dict('records')
         
         return report
     
@@ -373,10 +384,10 @@ class YouTubeDataEvaluator:
         
         # Export JSON report
         json_path = f"{output_dir}/{topic}_evaluation_report.json"
-        with open(json_path, 'w') as f:
+        with open(json_path, 'wb') as f:
             # Convert metrics to dict for JSON serialization
             report_data = self.evaluation_results[key]['report'].copy()
-            json.dump(report_data, f, indent=2, default=str)
+            f.write(orjson.dumps(report_data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
         
         # Export CSV with video details
         csv_path = f"{output_dir}/{topic}_video_analysis.csv"
@@ -398,6 +409,7 @@ def main():
     parser.add_argument("--all", action="store_true", help="Evaluate all available datasets")
     parser.add_argument("--export", action="store_true", help="Export results to files")
     parser.add_argument("--threshold", type=int, default=3, help="Quality threshold (1-5)")
+    parser.add_argument("--max-concurrency", type=int, default=int(os.environ.get("EVAL_MAX_CONCURRENCY", 8)), help="Quality checks in flight per dataset (default: $EVAL_MAX_CONCURRENCY or 8)")
     
     args = parser.parse_args()
     
@@ -414,22 +426,22 @@ def main():
     
     if args.all:
         datasets = evaluator.list_available_datasets()
+        evaluator.analyze_datasets(list(datasets.keys()), quality_threshold=args.threshold, max_concurrency=args.max_concurrency)
         for topic in datasets.keys():
-            evaluator.analyze_dataset(topic, quality_threshold=args.threshold)
             evaluator.print_summary_report(topic)
             if args.export:
                 evaluator.export_results(topic)
         return
     
     if args.topic:
-        evaluator.analyze_dataset(args.topic, args.timestamp, quality_threshold=args.threshold)
+        evaluator.analyze_dataset(args.topic, args.timestamp, quality_threshold=args.threshold, max_concurrency=args.max_concurrency)
         evaluator.print_summary_report(args.topic, args.timestamp)
         if args.export:
             evaluator.export_results(args.topic, args.timestamp)
     else:
         # Default behavior - evaluate mayonnaise dataset
         print("🔄 No arguments provided, running default evaluation...")
-        evaluator.analyze_dataset("how_to_make_mayonnaise", "20231001_120000", quality_threshold=args.threshold)
+        evaluator.analyze_dataset("how_to_make_mayonnaise", "20231001_120000", quality_threshold=args.threshold, max_concurrency=args.max_concurrency)
         evaluator.print_summary_report("how_to_make_mayonnaise", "20231001_120000")
 
 
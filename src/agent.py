@@ -1,21 +1,36 @@
-from typing import TypedDict, Dict, List, Any
+from typing import TypedDict, Dict, List, Any, Iterator, AsyncIterator, Literal, Optional
 from enum import Enum
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage, AIMessage
 from langchain_core.documents import Document
 from langchain_core.language_models.chat_models import BaseChatModel
 from langgraph.graph import StateGraph, END
-from langsmith import traceable, Client
+from langsmith import traceable
+from pydantic import BaseModel, Field
 
 import uuid
-import os
+import logging
 
 from src.prompts import get_decision_prompt, get_rag_prompt, get_direct_prompt
 
+logger = logging.getLogger(__name__)
+
+# Chunks scoring below this relevance are treated as off-topic; every store in src.vectorstore
+# reports relevance as cosine similarity (Chroma/Qdrant in cosine space, FAISS via its relevance_score_fn)
+MIN_RELEVANCE_SCORE = 0.15
+
+# Chat history role -> message class (anything unrecognised is treated as the assistant)
+_MESSAGE_CLASSES = {"human": HumanMessage, "ai": AIMessage, "assistant": AIMessage}
+
 class Action(Enum):
     SEARCH_VIDEOS = "search_videos"
     DIRECT_ANSWER = "direct_answer"
 
+class DecisionOrAnswer(BaseModel):
+    """Routing decision, plus the answer itself when no retrieval is needed."""
+    action: Literal["SEARCH_VIDEOS", "DIRECT_ANSWER"]
+    answer: Optional[str] = Field(default=None, description="Full answer to the question when action is DIRECT_ANSWER")
+
 class YouTubeRAGState(TypedDict):
     """Enhanced state for YouTube ReAct workflow."""
     query: str
@@ -28,45 +43,49 @@ class YouTubeRAGState(TypedDict):
     thread_id: str  
     url: List[str]  # New field to store relevant YouTube URLs
 
+def _to_messages(chat_history: List[Dict[str, str]]) -> List[Any]:
+    """Convert stored chat history dicts into LangChain messages."""
+    return [_MESSAGE_CLASSES.get(msg["role"], AIMessage)(content=msg["content"]) for msg in chat_history]
+
 # The function now accepts an instantiated llm object instead of a model_name string
 def create_youtube_rag_chain(vectorstore: Any, llm: BaseChatModel):
     """Create a RAG chain using a provided LLM instance."""
-    print("=" * 30)
-    print("=" * 20 + "LANGGRAPH" + "=" * 20)
-    print("=" * 30)
-
-    # Initialize LangSmith client
-    client = Client(api_key=os.getenv("LANGSMITH_API_KEY"))
+    logger.debug("Building LangGraph workflow")
 
     @traceable(run_type="llm", metadata={"llm": llm.model_name})
     def decide_action(state: YouTubeRAGState) -> YouTubeRAGState:
         """Decide whether to use vectorstore based on explicit YouTube mention."""
-        print("=" * 10 + "DECIDE NODE" + "=" * 10)
-        print(f"Deciding action for query: {state['query']}")
+        logger.debug("DECIDE NODE: deciding action for query: %s", state["query"])
         try:
             if "youtube" not in state["query"].lower():
                 state["action"] = Action.DIRECT_ANSWER.value
                 state["thought"] = "No explicit mention of YouTube. Using direct answer."
                 return state
 
-            print(f"YouTube mention found")
+            logger.debug("YouTube mention found")
 
             # GET PROMPT
             # - Local
             prompt = get_decision_prompt()
             # - PromptHUB
-            # prompt = client.pull_prompt("router_prompt", include_model=True)
+            # prompt = Client(api_key=os.getenv("LANGSMITH_API_KEY")).pull_prompt("router_prompt", include_model=True)
             
             # CREATE CHAIN
-            chain = prompt | llm
-            result = chain.invoke({"query": state["query"]})
+            # - structured output lets a DIRECT_ANSWER come back in this same call
+            chain = prompt | llm.with_structured_output(DecisionOrAnswer)
+            result = chain.invoke({
+                "chat_history": _to_messages(state["chat_history"]),
+                "query": state["query"]
+            })
             
             state["action"] = (
                 Action.SEARCH_VIDEOS.value 
-                if "SEARCH_VIDEOS" in result.content 
+                if result.action == "SEARCH_VIDEOS" 
                 else Action.DIRECT_ANSWER.value
             )
-            state["thought"] = result.content
+            state["thought"] = result.action
+            if state["action"] == Action.DIRECT_ANSWER.value and result.answer:
+                state["response"] = result.answer
             return state
         except Exception as e:
             state["error"] = f"Decision error: {str(e)}"
@@ -75,15 +94,17 @@ def create_youtube_rag_chain(vectorstore: Any, llm: BaseChatModel):
     @traceable(run_type="retriever", name="Chroma Retrieval")
     def retrieve(state: YouTubeRAGState) -> YouTubeRAGState:
         """Retrieve documents if needed."""
-        print("=" * 10 + "RETRIEVE NODE" + "=" * 10)
+        logger.debug("RETRIEVE NODE")
         try:
             if state["action"] == Action.SEARCH_VIDEOS.value:
-                docs = vectorstore.similarity_search(state["query"], k=5)
+                # - an off-topic query keeps no chunks, so generate answers with the canned reply instead of the LLM
+                scored = vectorstore.similarity_search_with_relevance_scores(state["query"], k=5, score_threshold=MIN_RELEVANCE_SCORE)
+                docs = [doc for doc, _ in scored]
                 state["context"] = docs
                 # De-duplicate URLs while preserving order
                 urls = [doc.metadata.get("url") for doc in docs if doc.metadata.get("url")]
                 state["url"] = list(dict.fromkeys(urls))
-                print(f"Retrieved {len(docs)} documents; unique URLs: {len(state['url'])}")
+                logger.debug("Retrieved %d documents; unique URLs: %d", len(docs), len(state["url"]))
             return state
         except Exception as e:
             state["error"] = f"Retrieval error: {str(e)}"
@@ -92,7 +113,7 @@ def create_youtube_rag_chain(vectorstore: Any, llm: BaseChatModel):
     @traceable(run_type="llm", metadata={"llm": llm.model_name})
     def generate_response(state: YouTubeRAGState) -> YouTubeRAGState:
         """Generate response based on action and context."""
-        print("=" * 10 + "GENERATE NODE" + "=" * 10)
+        logger.debug("GENERATE NODE")
         try:
             # If we chose to search but have no context, avoid hallucination
             if state["action"] == Action.SEARCH_VIDEOS.value and not state["context"]:
@@ -100,19 +121,14 @@ def create_youtube_rag_chain(vectorstore: Any, llm: BaseChatModel):
                 return state
             
             # Prepare chat history for the LLM
-            chat_history = []
-            for msg in state["chat_history"]:
-                if msg["role"] == "human":
-                    chat_history.append(HumanMessage(content=msg["content"]))
-                else:
-                    chat_history.append(AIMessage(content=msg["content"]))
+            chat_history = _to_messages(state["chat_history"])
 
             # Determine which prompt to use based on action
             if state["action"] == Action.SEARCH_VIDEOS.value:
-                print(f"\n'YouTube' mention found adding context")
+                logger.debug("'YouTube' mention found adding context")
                 prompt = get_rag_prompt()
             else:
-                print(f"\nNo YouTube mention found, answering with just: {llm.model_name}")
+                logger.debug("No YouTube mention found, answering with just: %s", llm.model_name)
                 prompt = get_direct_prompt()
 
             chain = prompt | llm
@@ -140,30 +156,21 @@ def create_youtube_rag_chain(vectorstore: Any, llm: BaseChatModel):
     workflow.add_node("generate", generate_response)
     
     def route_action(state: YouTubeRAGState) -> str:
-        return "retrieve" if state["action"] == Action.SEARCH_VIDEOS.value else "generate"
+        if state["action"] == Action.SEARCH_VIDEOS.value:
+            return "retrieve"
+        # - the decide node already answered, skip the second LLM call
+        return END if state["response"] else "generate"
 
     workflow.set_entry_point("decide")
-    workflow.add_conditional_edges("decide", route_action, {"retrieve": "retrieve", "generate": "generate"})
+    workflow.add_conditional_edges("decide", route_action, {"retrieve": "retrieve", "generate": "generate", END: END})
     workflow.add_edge("retrieve", "generate")
     workflow.add_edge("generate", END)
     
     return workflow.compile()
 
-# This function now accepts the llm object to pass it down
-def run_rag_chain(
-    query: str,
-    vectorstore: Any,
-    llm: BaseChatModel,
-    chat_history: List[Dict[str, str]] = None,
-    thread_id: str = None
-) -> Dict[str, Any]:
-    """Run the RAG workflow with a query and an LLM instance."""
-    
-    # Generate thread_id if not provided
-    if not thread_id:
-        thread_id = str(uuid.uuid4())
-
-    state = YouTubeRAGState(
+def _initial_state(query: str, chat_history: List[Dict[str, str]] = None, thread_id: str = None) -> YouTubeRAGState:
+    """Build the starting state for a RAG workflow run."""
+    return YouTubeRAGState(
         query=query,
         chat_history=chat_history or [],
         context=[],
@@ -171,9 +178,37 @@ def run_rag_chain(
         error="",
         action="",
         thought="",
-        thread_id=thread_id,
+        thread_id=thread_id or str(uuid.uuid4()),
         url=[]  # Initialize URL list
     )
+
+def _response_delta(mode: str, payload: Any, streamed: List[str]) -> str:
+    """Turn one LangGraph stream event into the next piece of response text."""
+    if mode == "messages":
+        chunk, metadata = payload
+        # - only the generate node's tokens belong to the answer (decide also calls the LLM)
+        if metadata.get("langgraph_node") == "generate" and isinstance(chunk.content, str) and chunk.content:
+            streamed.append(chunk.content)
+            return chunk.content
+    elif mode == "updates" and payload:
+        # - emit response text not already streamed (sources, canned replies, answers from decide)
+        emitted = "".join(streamed)
+        for node_state in payload.values():
+            response = (node_state or {}).get("response", "")
+            if response.startswith(emitted) and len(response) > len(emitted):
+                return response[len(emitted):]
+    return ""
+
+# This function now accepts the llm object to pass it down
+def run_rag_chain(
+    query: str,
+    vectorstore: Any,
+    llm: BaseChatModel,
+    chat_history: List[Dict[str, str]] = None,
+    thread_id: str = None
+) -> Dict[str, Any]:
+    """Run the RAG workflow with a query and an LLM instance."""
+    state = _initial_state(query, chat_history, thread_id)
     
     # Pass the llm object directly to the chain creator
     app = create_youtube_rag_chain(vectorstore, llm)
@@ -185,4 +220,34 @@ def run_rag_chain(
         "error": result["error"],
         "action": result["action"],
         "thought": result["thought"]
-    }
\ No newline at end of file
+    }
+
+def stream_rag_chain(
+    query: str,
+    vectorstore: Any,
+    llm: BaseChatModel,
+    chat_history: List[Dict[str, str]] = None,
+    thread_id: str = None
+) -> Iterator[str]:
+    """Run the RAG workflow and yield the response text as it is generated."""
+    app = create_youtube_rag_chain(vectorstore, llm)
+    streamed: List[str] = []
+    for mode, payload in app.stream(_initial_state(query, chat_history, thread_id), stream_mode=["messages", "updates"]):
+        delta = _response_delta(mode, payload, streamed)
+        if delta:
+            yield delta
+
+async def arun_rag_chain_stream(
+    query: str,
+    vectorstore: Any,
+    llm: BaseChatModel,
+    chat_history: List[Dict[str, str]] = None,
+    thread_id: str = None
+) -> AsyncIterator[str]:
+    """Async variant of `stream_rag_chain` for callers running an event loop."""
+    app = create_youtube_rag_chain(vectorstore, llm)
+    streamed: List[str] = []
+    async for mode, payload in app.astream(_initial_state(query, chat_history, thread_id), stream_mode=["messages", "updates"]):
+        delta = _response_delta(mode, payload, streamed)
+        if delta:
+            yield delta
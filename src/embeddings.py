@@ -0,0 +1,44 @@
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
+from langchain_openai import OpenAIEmbeddings
+
+import functools
+from typing import List
+
+
+class _QueryLRUCacheBackedEmbeddings(CacheBackedEmbeddings):
+    """CacheBackedEmbeddings with an in-process LRU in front of the on-disk query cache."""
+    query_cache_size = 1024
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # - tuples so callers can't mutate a cached vector in place
+        self._embed_query_cached = functools.lru_cache(maxsize=self.query_cache_size)(
+            lambda text: tuple(super(_QueryLRUCacheBackedEmbeddings, self).embed_query(text))
+        )
+
+    def embed_query(self, text: str) -> List[float]:
+        return list(self._embed_query_cached(text))
+
+
+def get_cached_embeddings(
+    model: str = "text-embedding-3-small",
+    cache_dir: str = "data/.embedding_cache",
+    **kwargs
+) -> CacheBackedEmbeddings:
+    """
+    OpenAI embeddings backed by an on-disk cache, so unchanged text is never re-embedded across runs.
+    Repeated queries within a process are also served from memory.
+
+    Args:
+        model: OpenAI embedding model name (also used as the cache namespace)
+        cache_dir: Directory for the cached vectors
+        **kwargs: Passed through to OpenAIEmbeddings (e.g. http_client)
+    """
+    return _QueryLRUCacheBackedEmbeddings.from_bytes_store(
+        OpenAIEmbeddings(model=model, **kwargs),
+        LocalFileStore(cache_dir),
+        namespace=model,
+        query_embedding_cache=True,
+        key_encoder="sha256"
+    )
@@ -1,10 +1,16 @@
 from dataclasses import dataclass
-from typing import Dict, List, Optional
-from langchain_openai import ChatOpenAI
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 import pandas as pd
 import time
+import asyncio
+import httpx
 from datetime import datetime
 
+from src.utils import run_coroutine
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
 @dataclass
 class EvaluationMetrics:
     """Stores comprehensive evaluation metrics for transcripts."""
@@ -28,10 +34,67 @@ class EvaluationMetrics:
     failed_videos: List[str]
     failure_reasons: Dict[str, str]
 
+def _quality_llm(model_name: str, http_async_client: httpx.AsyncClient) -> "ChatOpenAI":
+    """Build the quality-check LLM on the given async HTTP client."""
+    # - imported here so `eval.py --list` and other non-scoring paths skip loading langchain_openai
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(
+        model=model_name,
+        http_async_client=http_async_client,
+        temperature=0.0,
+        max_tokens=50,
+        # - the SDK backs off with jitter on 429s/connection errors, so a burst under the semaphore rides out rate limits
+        max_retries=6
+    )
+
+async def _score_transcript(llm: "ChatOpenAI", transcript: str, sem: asyncio.Semaphore) -> Tuple[int, str]:
+    """Ask the LLM for a 1-5 quality score and short reason for one transcript."""
+    # Quality check prompt
+    prompt = f"""You are a transcript quality analyst. Evaluate this full video transcript for coherence, formatting, and usability.
+
+        Rate on these criteria:
+        - Text coherence and readability
+        - Proper formatting and structure
+        - Content completeness
+        - Overall transcript quality
+
+        Score (1-5):
+        1=Unusable (gibberish/nonsense)
+        2=Poor (major formatting/coherence issues)
+        3=Fair (some issues but usable)
+        4=Good (minor issues)
+        5=Excellent (clean, coherent text)
+
+        Format:
+        SCORE: [number]
+        REASON: [brief explanation, max 10 words]
+
+        Text to analyze:
+        {transcript}
+        """
+
+    async with sem:
+        response = (await llm.ainvoke(prompt)).content
+    score_line, reason_line = response.split('\n')[:2]
+    
+    score = int(score_line.split(':')[1].strip())
+    reason = reason_line.split(':')[1].strip()
+    return score, reason
+
+async def _score_transcripts(model_name: str, transcripts: List[str], max_concurrency: int) -> list:
+    """Score all transcripts concurrently; failures come back as exceptions in their slot."""
+    # - the async connection pool is bound to this run's event loop, so it is created and closed per run
+    #   (sharing one across asyncio.run calls or threads fails with "Event loop is closed")
+    async with httpx.AsyncClient() as http_async_client:
+        llm = _quality_llm(model_name, http_async_client)
+        sem = asyncio.Semaphore(max_concurrency)
+        return await asyncio.gather(*[_score_transcript(llm, transcript, sem) for transcript in transcripts], return_exceptions=True)
+
 def evaluate_transcripts(
     df: pd.DataFrame,
     quality_threshold: int = 3,
-    model_name: str = "gpt-3.5-turbo"
+    model_name: str = "gpt-4o-mini",
+    max_concurrency: int = 8
 ) -> EvaluationMetrics:
     """
     Comprehensive evaluation of transcript coverage and quality.
@@ -39,25 +102,19 @@ def evaluate_transcripts(
     Args:
         df: DataFrame with video_id and transcript columns
         quality_threshold: Minimum acceptable quality score (1-5)
-        sample_size: Number of characters to analyze per transcript
         model_name: LLM model to use for quality analysis
+        max_concurrency: Maximum number of quality checks in flight at once
     """
     start_time = time.time()
     
-    # Initialize LLM
-    llm = ChatOpenAI(
-        model=model_name,
-        temperature=0.0,
-        max_tokens=50
-    )
-    
     # Initialize tracking
     quality_scores: Dict[str, int] = {}
     quality_reasons: Dict[str, str] = {}
     failed_videos: List[str] = []
     failure_reasons: Dict[str, str] = {}
+    to_score: List[Tuple[str, str]] = []
 
-    # Evaluate each transcript
+    # Screen out missing/short transcripts; the rest are scored by the LLM below
     for _, row in df.iterrows():
         video_id = row['video_id']
         transcript = row.get('transcript')
@@ -74,49 +131,26 @@ def evaluate_transcripts(
             quality_reasons[video_id] = "Transcript too short"
             continue
         
-        # Quality check prompt
-        prompt = f"""You are a transcript quality analyst. Evaluate this full video transcript for coherence, formatting, and usability.
-
-        Rate on these criteria:
-        - Text coherence and readability
-        - Proper formatting and structure
-        - Content completeness
-        - Overall transcript quality
-
-        Score (1-5):
-        1=Unusable (gibberish/nonsense)
-        2=Poor (major formatting/coherence issues)
-        3=Fair (some issues but usable)
-        4=Good (minor issues)
-        5=Excellent (clean, coherent text)
-
-        Format:
-        SCORE: [number]
-        REASON: [brief explanation, max 10 words]
+        to_score.append((video_id, transcript))
 
-        Text to analyze:
-        {transcript}
-        """
-
-        try:
-            response = llm.invoke(prompt).content
-            score_line, reason_line = response.split('\n')[:2]
-            
-            score = int(score_line.split(':')[1].strip())
-            reason = reason_line.split(':')[1].strip()
-            
-            quality_scores[video_id] = score
-            quality_reasons[video_id] = reason
-            
-            if score < quality_threshold:
-                failed_videos.append(video_id)
-                failure_reasons[video_id] = f"Low quality score: {score}/5"
-                
-        except Exception as e:
+    # Evaluate the remaining transcripts concurrently
+    scoring = _score_transcripts(model_name, [transcript for _, transcript in to_score], max_concurrency)
+    results = run_coroutine(scoring)
+    for (video_id, _), result in zip(to_score, results):
+        if isinstance(result, Exception):
             failed_videos.append(video_id)
-            failure_reasons[video_id] = str(e)
+            failure_reasons[video_id] = str(result)
             quality_scores[video_id] = 1
             quality_reasons[video_id] = "Error during quality check"
+            continue
+
+        score, reason = result
+        quality_scores[video_id] = score
+        quality_reasons[video_id] = reason
+        
+        if score < quality_threshold:
+            failed_videos.append(video_id)
+            failure_reasons[video_id] = f"Low quality score: {score}/5"
 
     # Calculate metrics
     total_videos = len(df)
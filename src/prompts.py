@@ -10,8 +10,10 @@ def get_decision_prompt() -> ChatPromptTemplate:
             - Choose SEARCH_VIDEOS only if the word "youtube" appears in the question
             - Choose DIRECT_ANSWER for all other questions
 
-        Respond with exactly one token: SEARCH_VIDEOS or DIRECT_ANSWER. Do not include any reasoning.
+        Set action to SEARCH_VIDEOS or DIRECT_ANSWER. Do not include any reasoning.
+        If you choose DIRECT_ANSWER, also write the full answer to the question in answer; otherwise leave answer empty.
         """),
+        MessagesPlaceholder(variable_name="chat_history"),
         ("human", "{query}")
     ])
 
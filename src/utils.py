@@ -1,11 +1,14 @@
 import re
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# Runs of anything that isn't a letter or digit (underscores included)
+_NON_ALNUM_RUN_RE = re.compile(r'[^a-zA-Z0-9]+')
 
 def _format_collection_name(name: str) -> str:
     """Format string to valid Qdrant collection name using regex."""
-    # Replace spaces and special chars with underscore
-    formatted = re.sub(r'[^a-zA-Z0-9]', '_', name)
-    # Replace multiple underscores with single underscore
-    formatted = re.sub(r'_+', '_', formatted)
+    # Replace each run of spaces/special chars/underscores with a single underscore
+    formatted = _NON_ALNUM_RUN_RE.sub('_', name)
     # Remove leading/trailing underscores
     formatted = formatted.strip('_')
     # Convert to lowercase for consistency
@@ -15,6 +18,16 @@ def _format_collection_name(name: str) -> str:
         formatted = 'collection_' + formatted
     return formatted
 
+def run_coroutine(coro):
+    """Run a coroutine to completion from sync code, even when the caller already has a running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # - already inside an event loop (e.g. a Jupyter kernel): asyncio.run would raise, so use a worker thread
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
 def print_evaluation_results(metrics_df, quality_details, rag_metrics=None):
     """Print comprehensive evaluation results with formatting."""
     
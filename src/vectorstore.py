@@ -1,12 +1,13 @@
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-from langchain_experimental.text_splitter import SemanticChunker
-from langchain_text_splitters import SentenceTransformersTokenTextSplitter
 
 from langchain_chroma import Chroma
-from langchain_qdrant import QdrantVectorStore
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams   
+import chromadb
+from chromadb.errors import NotFoundError
+import hashlib
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
 
 
 # Documents Recursive Processing
@@ -89,10 +90,13 @@ def process_documents_semantic(video_df, embedding_model):
             # You might need to adjust percentile_threshold or standard_deviation_threshold
             # based on your data. Default is 95 for percentile.
         )
-        semantic_chunks = text_splitter.split_documents(documents)
+        # - each video is split independently; its sentence embeddings are I/O-bound, so chunk videos in parallel threads
+        with ThreadPoolExecutor(max_workers=max(1, min(8, len(documents)))) as executor:
+            semantic_chunks = [chunk for doc_chunks in executor.map(lambda doc: text_splitter.split_documents([doc]), documents) for chunk in doc_chunks]
     except ImportError:
         print("WARNING: langchain_experimental.text_splitter.SemanticChunker not found.")
         print("Falling back to a simpler sentence-based splitting for demonstration.")
+        from langchain_text_splitters import SentenceTransformersTokenTextSplitter
         # Fallback if SemanticChunker is not available or causes issues
         # This is not "true" semantic chunking but a step towards it
         sentence_splitter = SentenceTransformersTokenTextSplitter(chunk_overlap=0, tokens_per_chunk=256)
@@ -122,39 +126,95 @@ def process_documents_semantic(video_df, embedding_model):
 
 
 # CHROMA -------------------------------------------------------------------------------------------------------------------------------------------
-def create_chroma_vectorstore(chunks, embedding, topic="collection"):
-    """Create new or connect to existing Chroma vectorstore."""
-    persist_dir = "data/chroma_db"
+# Characters Chroma doesn't allow in collection names
+_CHROMA_NAME_RE = re.compile(r'[^a-zA-Z0-9._-]+')
+
+def _embedding_model_name(embedding):
+    """Best-effort model name for an embedding object (unwraps CacheBackedEmbeddings)."""
+    embedding = getattr(embedding, "underlying_embeddings", embedding)
+    return str(getattr(embedding, "model", None) or getattr(embedding, "model_name", None) or type(embedding).__name__)
+
+def _key_chunks(chunks, model_name):
+    """Map sha256(model + content)[:16] -> chunk tagged with that hash; duplicate contents collapse to one entry."""
+    keyed = {}
+    for chunk in chunks:
+        content_hash = hashlib.sha256(f"{model_name}\n{chunk.page_content}".encode()).hexdigest()[:16]
+        keyed.setdefault(content_hash, Document(
+            page_content=chunk.page_content,
+            metadata={**chunk.metadata, 'content_hash': content_hash, 'embedding_model': model_name}
+        ))
+    return keyed
 
-    # First try to connect to existing Chroma vectorstore
+def _drop_legacy_chroma_collection(client, topic):
+    """Migration: remove the pre-content-hash collection named by topic alone (its ids can't be deduplicated)."""
+    if topic not in {collection.name for collection in client.list_collections()}:
+        return
     try:
-        vectorstore = Chroma(
-            persist_directory=persist_dir,
-            embedding_function=embedding,
-            collection_name=topic
-        )
-        # Check if collection has documents
-        if vectorstore._collection.count() > 0:
-            print(f"CHROMA: Connected to existing Chroma collection '{topic}' with {vectorstore._collection.count()} documents")
-            return vectorstore
-    except Exception as e:
-        print(f"CHROMA: No existing collection found: {str(e)}")
+        client.delete_collection(topic)
+    except NotFoundError:
+        # - another session migrated it first
+        return
+    print(f"CHROMA: Removed legacy collection '{topic}'; it is rebuilt under a model-scoped name")
 
-    # Create new vectorstore if none exists or is empty     
-    print(f"CHROMA: Creating new Chroma collection '{topic}'")
-    vectorstore = Chroma.from_documents(
-        documents=chunks,
-        embedding=embedding,
-        persist_directory=persist_dir,
-        collection_name=topic
-    )   
-    print(f"Created new collection with {len(chunks)} documents")
+def create_chroma_vectorstore(chunks, embedding, topic="collection", batch_size=512):
+    """Create new or connect to existing Chroma vectorstore, embedding only chunks it doesn't hold yet."""
+    persist_dir = "data/chroma_db"
+
+    # Native client so new collections can be tuned and filled in large batches
+    client = chromadb.PersistentClient(path=persist_dir)
+
+    # Scope the collection by embedding model so vectors of different models/dimensions never mix
+    model_name = _embedding_model_name(embedding)
+    collection_name = f"{topic}__{_CHROMA_NAME_RE.sub('_', model_name).strip('._-')}"
+    _drop_legacy_chroma_collection(client, topic)
+
+    # - search_ef is pinned so recall (and query cost) doesn't shift with the k a caller asks for
+    collection = client.get_or_create_collection(
+        name=collection_name,
+        metadata={"hnsw:space": "cosine", "hnsw:construction_ef": 200, "hnsw:M": 32, "hnsw:search_ef": 128}
+    )
+    vectorstore = Chroma(client=client, collection_name=collection_name, embedding_function=embedding)
+
+    # Key each chunk by (embedding model, content) so reruns only embed new text
+    keyed = _key_chunks(chunks, model_name)
+
+    document_count = collection.count()
+    existing = set(collection.get(ids=list(keyed), include=[])["ids"]) if document_count > 0 and keyed else set()
+    new_chunks = [(content_hash, chunk) for content_hash, chunk in keyed.items() if content_hash not in existing]
+    if not new_chunks:
+        print(f"CHROMA: Connected to existing Chroma collection '{collection_name}' with {document_count} documents")
+        return vectorstore
+
+    # Fill the collection batch by batch
+    print(f"CHROMA: Adding {len(new_chunks)} new chunks to Chroma collection '{collection_name}' ({document_count} already stored)")
+    ids = [content_hash for content_hash, _ in new_chunks]
+    texts = [chunk.page_content for _, chunk in new_chunks]
+    metadatas = [chunk.metadata for _, chunk in new_chunks]
+    batches = [(ids[i:i+batch_size], texts[i:i+batch_size], metadatas[i:i+batch_size]) for i in range(0, len(ids), batch_size)]
+    # - embed the next batch in a worker thread while the current one is inserted into the index
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(embedding.embed_documents, batches[0][1])
+        for n, (batch_ids, batch_texts, batch_metadatas) in enumerate(batches):
+            batch_embeddings = pending.result()
+            if n + 1 < len(batches):
+                pending = executor.submit(embedding.embed_documents, batches[n + 1][1])
+            collection.add(
+                ids=batch_ids,
+                documents=batch_texts,
+                embeddings=batch_embeddings,
+                metadatas=batch_metadatas
+            )
+    print(f"Collection now holds {collection.count()} documents")
 
     return vectorstore
 
 # QDRANT
 def create_qdrant_vectorstore(chunks, embedding, topic="collection"):
     """Create new or connect to existing Qdrant vectorstore."""
+    # - Qdrant is optional; importing it lazily keeps it out of the Chroma-only app's startup
+    from langchain_qdrant import QdrantVectorStore
+    from qdrant_client import QdrantClient
+    from qdrant_client.models import Distance, VectorParams
     persist_dir = "data/qdrant_db"
     
     # Initialize Qdrant client
@@ -197,3 +257,75 @@ def create_qdrant_vectorstore(chunks, embedding, topic="collection"):
     print(f"Created new collection with {len(chunks)} documents")
     
     return vectorstore
+
+# FAISS
+def _faiss_cosine_relevance(distance):
+    """Cosine similarity from a FAISS L2 index's squared distance (unit-norm vectors: d² = 2 - 2·cos)."""
+    # - matches the cosine relevance Chroma/Qdrant report, so one threshold fits every backend
+    return 1.0 - distance / 2
+
+def create_faiss_vectorstore(chunks, embedding, topic="collection", flat_index_limit=10_000):
+    """Create new or load existing FAISS vectorstore, adding only chunks it doesn't hold yet.
+
+    New indexes are exact (flat) below `flat_index_limit` chunks and HNSW beyond it.
+    """
+    # - FAISS is optional (faiss-cpu); imported lazily like Qdrant
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_community.vectorstores import FAISS
+
+    # Scope the index by embedding model, like the Chroma collections
+    model_name = _embedding_model_name(embedding)
+    index_name = f"{topic}__{_CHROMA_NAME_RE.sub('_', model_name).strip('._-')}"
+    persist_dir = f"data/faiss_db/{index_name}"
+
+    # First try to load an existing index
+    vectorstore = None
+    if os.path.exists(persist_dir):
+        try:
+            vectorstore = FAISS.load_local(persist_dir, embedding, allow_dangerous_deserialization=True, relevance_score_fn=_faiss_cosine_relevance)
+            print(f"FAISS: Loaded existing index '{index_name}' with {vectorstore.index.ntotal} vectors")
+        except Exception as e:
+            print(f"FAISS: No existing index found: {str(e)}")
+
+    # Key each chunk by (embedding model, content) so reruns only embed new text
+    keyed = _key_chunks(chunks, model_name)
+    existing = set(vectorstore.index_to_docstore_id.values()) if vectorstore is not None else set()
+    new_ids = [content_hash for content_hash in keyed if content_hash not in existing]
+    if vectorstore is not None and not new_ids:
+        return vectorstore
+
+    texts = [keyed[content_hash].page_content for content_hash in new_ids]
+    vectors = embedding.embed_documents(texts) if texts else []
+
+    # Create new index sized to the embedding dimension
+    if vectorstore is None:
+        # - with no chunks (e.g. no transcripts) the dimension comes from a probe query instead
+        dimension = len(vectors[0]) if vectors else len(embedding.embed_query(topic))
+        if len(new_ids) < flat_index_limit:
+            # - brute force is exact and has no graph to build; L2 ranks unit-norm OpenAI vectors like cosine
+            print(f"FAISS: Creating new flat index '{index_name}'")
+            index = faiss.IndexFlatL2(dimension)
+        else:
+            print(f"FAISS: Creating new HNSW index '{index_name}'")
+            index = faiss.IndexHNSWFlat(dimension, 32)
+            index.hnsw.efSearch = 128
+        vectorstore = FAISS(
+            embedding_function=embedding,
+            index=index,
+            docstore=InMemoryDocstore(),
+            index_to_docstore_id={},
+            relevance_score_fn=_faiss_cosine_relevance
+        )
+
+    if new_ids:
+        print(f"FAISS: Adding {len(new_ids)} new chunks to index '{index_name}'")
+        vectorstore.add_embeddings(
+            list(zip(texts, vectors)),
+            metadatas=[keyed[content_hash].metadata for content_hash in new_ids],
+            ids=new_ids
+        )
+    vectorstore.save_local(persist_dir)
+    print(f"Index now holds {vectorstore.index.ntotal} vectors")
+
+    return vectorstore
@@ -1,16 +1,49 @@
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from youtube_transcript_api import YouTubeTranscriptApi
+from youtube_transcript_api import YouTubeTranscriptApi, RequestBlocked, NoTranscriptFound
 import pandas as pd
+import numpy as np
 import time  # Add time import
 import os
 from dotenv import load_dotenv
 import json
+import orjson
+import gzip
+import hashlib
+import tempfile
+import asyncio
+import functools
+import httplib2
+from operator import attrgetter
+import requests
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils import run_coroutine
 
 load_dotenv()
 PODCAST_CATEGORY_ID = 22  # YouTube category ID for podcasts
+VIDEO_COLUMNS = ('video_id', 'url', 'author', 'title', 'description', 'publish_time', 'view_count')
+SEARCH_CACHE_DIR = "data/.search_cache"
+SEARCH_CACHE_TTL = 24 * 60 * 60  # seconds; searches older than a day are re-run
+TRANSCRIPT_LANGUAGES = ['en', 'en-US']
+TRANSCRIPT_CACHE_DIR = "data/youtube_data/transcripts_cache"
+TRANSCRIPT_CACHE_TTL = 7 * 24 * 60 * 60  # seconds; cached transcripts older than a week are refetched
+
+@functools.lru_cache(maxsize=4)
+def _client(api_key):
+    """Build (once per API key) a YouTube client from the bundled discovery document."""
+    # - the Resource is shared across threads; httplib2 isn't thread-safe, so every execute() gets its own Http()
+    return build(serviceName='youtube', version='v3', developerKey=api_key, cache_discovery=False, static_discovery=True)
 
-def search_videos(topic, api_key, max_results=20):
+@functools.lru_cache(maxsize=1)
+def _transcript_api():
+    """Transcript client backed by one pooled requests.Session, so TLS connections are reused across videos."""
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=50))
+    return YouTubeTranscriptApi(http_client=session)
+
+def search_videos(topic, api_key, max_results=20, force_refresh=False, *, category_id=None, duration=None):
     """
     Description:
         Searches for videos on YouTube based on a given topic or keyword.
@@ -20,13 +53,33 @@ def search_videos(topic, api_key, max_results=20):
         channel_id (str, optional): The channel ID to filter results.
         api_key (str): The API key for accessing the YouTube Data API.
         max_results (int, optional): The maximum number of video results to retrieve. Defaults to 20.
+        force_refresh (bool, optional): Ignore cached results and query the API. Defaults to False.
+        category_id (int, optional): Restrict results to a YouTube video category.
+        duration (str, optional): Restrict results by length ('short', 'medium' or 'long').
 
     Returns:
         list: A list of video IDs corresponding to the search results.
     """
 
-    # - Initialize the YouTube API client
-    youtube = build(serviceName='youtube', version='v3', developerKey=api_key)
+    # - Identical searches within the TTL are served from disk (each search costs 100 quota units)
+    cache_path = f"{SEARCH_CACHE_DIR}/{hashlib.sha1(f'{topic}|{max_results}|{category_id}|{duration}'.encode()).hexdigest()}.json"
+    if not force_refresh:
+        try:
+            if time.time() - os.path.getmtime(cache_path) < SEARCH_CACHE_TTL:
+                with open(cache_path) as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    # - Reuse the cached YouTube API client
+    youtube = _client(api_key)
+
+    # - only send the filters that were requested
+    filters = {}
+    if category_id is not None:
+        filters['videoCategoryId'] = category_id
+    if duration is not None:
+        filters['videoDuration'] = duration
 
     try:
         search_request = youtube.search().list(
@@ -34,13 +87,11 @@ def search_videos(topic, api_key, max_results=20):
             part='id,snippet',
             maxResults=max_results,
             type='video',
-            videoCategoryId=PODCAST_CATEGORY_ID,
-            videoDuration='long',
+            **filters
         )
-        search_response = search_request.execute()
+        search_response = search_request.execute(http=httplib2.Http())
         
         video_ids = [item['id']['videoId'] for item in search_response.get('items', [])]
-        return video_ids
     except HttpError as e:
         print(f"An HTTP error occurred during video search: {e}")
         return []
@@ -48,100 +99,222 @@ def search_videos(topic, api_key, max_results=20):
         print(f"An unexpected error occurred during video search: {e}")
         return []
 
-def get_video_details(video_ids, api_key, delay: float = 1.0):
+    # - a failed cache write must not discard a search that already spent quota
+    try:
+        os.makedirs(SEARCH_CACHE_DIR, exist_ok=True)
+        with open(cache_path, 'w') as f:
+            json.dump(video_ids, f)
+    except OSError as e:
+        print(f"Could not cache search results: {e}")
+    return video_ids
+
+# Long-form podcast search used by the app
+search_podcasts = functools.partial(search_videos, category_id=PODCAST_CATEGORY_ID, duration='long')
+
+def _transcript_cache_get(video_id):
+    """Return the cached transcript for a video, or None if missing, unreadable, empty or older than the TTL."""
+    path = f"{TRANSCRIPT_CACHE_DIR}/{video_id}.txt.gz"
+    try:
+        if time.time() - os.path.getmtime(path) > TRANSCRIPT_CACHE_TTL:
+            return None
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            return f.read() or None
+    # - a truncated gzip raises EOFError, not OSError; treat any bad entry as a miss so it gets refetched
+    except (OSError, EOFError, UnicodeDecodeError):
+        return None
+
+def _transcript_cache_put(video_id, transcript_text):
+    """Store a fetched transcript as gzip-compressed text; failures only cost the cache entry."""
+    tmp_path = None
+    try:
+        os.makedirs(TRANSCRIPT_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=TRANSCRIPT_CACHE_DIR, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as f:
+            f.write(transcript_text)
+        # - atomic rename: readers see either no entry or the complete one, never a partial file
+        os.replace(tmp_path, f"{TRANSCRIPT_CACHE_DIR}/{video_id}.txt.gz")
+        tmp_path = None
+    except OSError as e:
+        print(f"Could not cache transcript for {video_id}: {e}")
+    finally:
+        # - also runs on Ctrl-C, so an interrupted write never leaves its temp file behind
+        if tmp_path is not None:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+class TokenBucket:
+    """Async token-bucket rate limiter: bursts up to `burst` requests, refilling at `rate` tokens per second."""
+
+    def __init__(self, rate: float = 1.0, burst: int = 5):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Take one token, waiting only when the bucket is empty."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def penalize(self, factor: float = 0.5):
+        """Multiplicatively cut the rate and drain the bucket after the server throttles us."""
+        self.rate = max(self.rate * factor, 0.05)
+        self._tokens = 0.0
+
+    def recover(self, step: float = 0.1):
+        """Additively restore the rate after a successful request, up to the configured rate."""
+        self.rate = min(self.rate + step, self.max_rate)
+
+def _is_throttled(e):
+    """True if a transcript request failed because YouTube is rate limiting us."""
+    # - HTTP 429s surface as IpBlocked, a RequestBlocked subclass; don't sniff the message, it contains the video URL
+    return isinstance(e, RequestBlocked)
+
+def _fetch_english_transcript(video_id):
+    """List a video's transcripts once, then fetch the manual English track, else the auto-generated one."""
+    transcript_list = _transcript_api().list(video_id)
+    try:
+        transcript = transcript_list.find_manually_created_transcript(TRANSCRIPT_LANGUAGES)
+    except NoTranscriptFound:
+        transcript = transcript_list.find_generated_transcript(TRANSCRIPT_LANGUAGES)
+    return transcript.fetch()
+
+async def _fetch_transcript(video_id, sem, bucket):
+    """Fetch one English transcript off the event loop, rate limited by `bucket`."""
+    async with sem:
+        await bucket.acquire()
+        try:
+            transcript = await asyncio.to_thread(_fetch_english_transcript, video_id)
+        except Exception as e:
+            if _is_throttled(e):
+                bucket.penalize()
+            raise
+    bucket.recover()
+    # - attrgetter fetches each snippet's text in C rather than via a bytecode loop
+    return " ".join(map(attrgetter('text'), transcript))
+
+async def _fetch_all_transcripts(video_ids, rate, burst, max_concurrency):
+    """Fetch transcripts for all videos concurrently; videos without an English transcript map to None."""
+    sem = asyncio.Semaphore(max_concurrency)
+    bucket = TokenBucket(rate=rate, burst=burst)
+    transcripts_map = {}
+
+    # - cache hits skip both the request and the rate limiter
+    fetch_ids = []
+    for video_id in video_ids:
+        cached = _transcript_cache_get(video_id)
+        if cached is not None:
+            transcripts_map[video_id] = cached
+        else:
+            fetch_ids.append(video_id)
+    print(f"Transcript cache: {len(transcripts_map)} hits, {len(fetch_ids)} to fetch")
+
+    results = await asyncio.gather(*[_fetch_transcript(video_id, sem, bucket) for video_id in fetch_ids], return_exceptions=True)
+    for video_id, result in zip(fetch_ids, results):
+        if isinstance(result, Exception):
+            print(f"Error fetching transcript for Video ID {video_id}: {str(result)}")
+            transcripts_map[video_id] = None
+        else:
+            print(f"Successfully fetched transcript for {video_id}")
+            transcripts_map[video_id] = result
+            _transcript_cache_put(video_id, result)
+
+    return transcripts_map
+
+def _fetch_all_details(youtube, video_ids):
+    """Fetch video details for all IDs and return one record per video, in VIDEO_COLUMNS order."""
+    video_rows = []
+    batch_items = {}
+
+    def _collect(request_id, response, exception):
+        if exception is not None:
+            print(f"An HTTP error occurred for batch {request_id}: {exception}")
+            return
+        batch_items[request_id] = response.get('items', [])
+
+    ### BATCH: one HTTP round-trip for every 50-ID videos().list call ##########
+    batch = youtube.new_batch_http_request(callback=_collect)
+    for i in range(0, len(video_ids), 50):
+        batch_ids = video_ids[i:i+50]
+        batch.add(
+            youtube.videos().list(
+                part='snippet,contentDetails,statistics,status',
+                id=",".join(batch_ids)
+            ),
+            request_id=str(i)
+        )
+    try:
+        batch.execute(http=httplib2.Http())
+    except Exception as e:
+        print(f"An unexpected error occurred during the video details batch: {e}")
+
+    # - extract video details from the responses, in request order
+    for request_id in sorted(batch_items, key=int):
+        for item in batch_items[request_id]:
+            snippet = item.get("snippet") or {}
+            statistics = item.get("statistics") or {}
+            video_rows.append((
+                item['id'],
+                f"https://www.youtube.com/watch?v={item['id']}",
+                snippet.get("channelTitle", "N/A"),
+                snippet.get("title", "N/A"),
+                snippet.get("description", "N/A"),
+                snippet.get("publishedAt", "N/A"),
+                int(statistics.get("viewCount", 0) or 0)
+            ))
+    return video_rows
+
+async def _fetch_details_and_transcripts(youtube, video_ids, rate, burst, max_concurrency):
+    """Run the details batch (in a worker thread) alongside the transcript fetches."""
+    return await asyncio.gather(
+        asyncio.to_thread(_fetch_all_details, youtube, video_ids),
+        _fetch_all_transcripts(video_ids, rate, burst, max_concurrency)
+    )
+
+def get_video_details(video_ids, api_key, rate: float = 1.0, burst: int = 5, max_concurrency: int = 8):
     """
     Get video details and transcripts with rate limiting.
     
     Args:
         video_ids: List of YouTube video IDs
         api_key: YouTube API key
-        delay: Time to wait between requests in seconds
+        rate: Sustained transcript requests per second
+        burst: Transcript requests allowed back-to-back before the rate applies
+        max_concurrency: Maximum number of transcript requests in flight at once
     """
 
-    # Initialize the YouTube API client
-    youtube = build(serviceName='youtube', version='v3', developerKey=api_key)
-    
-    
-    video_data_list = []
-    ### LOOP: Iterate through batch & fetch details ##########  
-    for i in range(0, len(video_ids), 50): 
-        batch_ids = video_ids[i:i+50]
+    # Reuse the cached YouTube API client
+    youtube = _client(api_key)
 
-        try:
-            video_request = youtube.videos().list(
-                part='snippet,contentDetails,statistics,status',
-                id=",".join(batch_ids)
-            )
-            video_response = video_request.execute()
-            # - extract video details from the response
-            for item in video_response.get('items', []):
-                video_id = item['id']
-                video_author = item.get("snippet", {}).get("channelTitle", "N/A")
-                video_title = item.get("snippet", {}).get("title", "N/A")
-                video_description = item.get("snippet", {}).get("description", "N/A")
-                publish_time = item.get("snippet", {}).get("publishedAt", "N/A")
-                video_viewcount = item.get("statistics", {}).get("viewCount", 0)
-            
-                video_data = {
-                    "video_id": video_id,
-                    "url": f"https://www.youtube.com/watch?v={video_id}",
-                    "author": video_author,
-                    "title": video_title,
-                    "description": video_description,
-                    "publish_time": publish_time,
-                    "view_count": int(video_viewcount)
-                }
-                video_data_list.append(video_data)
-
-        except HttpError as e:
-            print(f"An HTTP error occurred for batch {batch_ids}: {e}")
-            # You can add retry logic here, or simply skip this batch
-            continue
-        except Exception as e:
-            print(f"An unexpected error occurred for batch {batch_ids}: {e}")
-            continue
-    
-    ### Separate LOOP: fetch transcripts ################
-    print("=" * 20 + " FETCH TRANSCRIPT " + "=" * 20)
-    transcripts_map = {}
-    for video_id in video_ids: 
-        transcript_text = None
-        try:
-            print(f"Fetching transcript for video {video_id}...")
-            
-            # Add delay before request
-            time.sleep(delay)
-            
-            transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=['en'])
-            transcript_text = " ".join([entry['text'] for entry in transcript])
-            print(f"Successfully fetched transcript for {video_id}")
-            print("---" * 20)
-            transcripts_map[video_id] = transcript_text
-            
-        except Exception as e:
-            print(f"Error fetching transcript for Video ID {video_id}: {str(e)}")
-            try:
-                print(f"Attempting to fetch auto-generated transcript...")
-                time.sleep(delay)  # Add delay before retry
-                transcript = YouTubeTranscriptApi.get_transcript(
-                    video_id, 
-                    languages=['en'], 
-                    preserve_formatting=True
-                )
-                transcript_text = " ".join([entry['text'] for entry in transcript])
-                print(f"Successfully fetched auto-generated transcript")
-                transcripts_map[video_id] = transcript_text                
-            except Exception as auto_e:
-                print(f"Error fetching auto-generated transcript: {str(auto_e)}")
-                transcripts_map[video_id] = None
+    ### Overlap: details batch and transcript fetches run at the same time ################
+    print("=" * 20 + " FETCH DETAILS + TRANSCRIPTS " + "=" * 20)
+    video_rows, transcripts_map = run_coroutine(
+        _fetch_details_and_transcripts(youtube, video_ids, rate, burst, max_concurrency)
+    )
 
     # Create a DataFrame
-    video_df = pd.DataFrame(video_data_list)
+    # - typed records skip per-row dict hashing and pandas' dtype inference
+    video_df = pd.DataFrame.from_records(video_rows, columns=VIDEO_COLUMNS)
+    video_df = video_df.astype({'video_id': 'string', 'author': 'string', 'view_count': 'int64'}, copy=False)
     
     # Add transcripts to the DataFrame
     # - this correctly aligns transcripts even if some video details failed to fetch.
     print("\nMapping transcripts to DataFrame...")
-    video_df['transcript'] = video_df['video_id'].map(transcripts_map)
+    # - look each distinct ID up once, then gather by integer code in NumPy
+    video_codes = pd.Categorical(video_df['video_id'])
+    transcripts = np.array([transcripts_map.get(video_id) for video_id in video_codes.categories], dtype=object)
+    video_df['transcript'] = pd.Series(transcripts[video_codes.codes], index=video_df.index, dtype='string')
     print(f"Mapped transcripts to {len(video_df)} videos")
 
     return video_df
@@ -168,16 +341,21 @@ def store_video_details(
         os.makedirs(f"{base_path}/{subdir}", exist_ok=True)
     
     # Prepare paths
-    raw_path = f"{base_path}/raw_data/{formatted_topic}_{timestamp}.csv"
-    transcript_path = f"{base_path}/transcripts/{formatted_topic}_{timestamp}.csv"
+    raw_path = f"{base_path}/raw_data/{formatted_topic}_{timestamp}.parquet"
+    transcript_path = f"{base_path}/transcripts/{formatted_topic}_{timestamp}.parquet"
     metadata_path = f"{base_path}/metadata/{formatted_topic}_{timestamp}.json"
     
-    # Store full raw data
-    video_df.to_csv(raw_path, index=False)
-    
-    # Store transcripts separately
-    transcript_df = video_df[['video_id', 'title', 'transcript']].copy()
-    transcript_df.to_csv(transcript_path, index=False)
+    # Store full raw data and transcripts separately
+    # - Parquet keeps dtypes and lets readers project columns; zstd shrinks the transcript text
+    # - pyarrow releases the GIL while compressing, so the two files are written in parallel
+    transcript_df = video_df[['video_id', 'title', 'transcript']]
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        writes = [
+            executor.submit(df.to_parquet, path, engine='pyarrow', compression='zstd', compression_level=5, index=False)
+            for df, path in ((video_df, raw_path), (transcript_df, transcript_path))
+        ]
+        for write in writes:
+            write.result()
     
     # Store metadata (convert numpy types to Python native types)
     metadata = {
@@ -186,12 +364,13 @@ def store_video_details(
         'total_videos': int(len(video_df)),
         'videos_with_transcripts': int(video_df['transcript'].notna().sum()),
         'coverage_rate': float(video_df['transcript'].notna().sum() / len(video_df) * 100),
-        'source_urls': [str(url) for url in video_df['url'].tolist()],
-        'video_ids': [str(vid) for vid in video_df['video_id'].tolist()]
+        'source_urls': video_df['url'].tolist(),
+        'video_ids': video_df['video_id'].tolist()
     }
     
-    with open(metadata_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    # - orjson encodes (and pretty-prints) in C; OPT_SERIALIZE_NUMPY covers any numpy scalars
+    with open(metadata_path, 'wb') as f:
+        f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
     
     print(f"\nStored video details:")
     print(f"- Raw data: {raw_path}")
@@ -204,7 +383,12 @@ def store_video_details(
         'metadata_path': metadata_path
     }
 
-def load_video_details(topic: str = None, timestamp: str = None, base_path: str = "data/youtube_data") -> pd.DataFrame:
+def load_video_details(
+    topic: str = None,
+    timestamp: str = None,
+    base_path: str = "data/youtube_data",
+    columns: list = None
+) -> pd.DataFrame:
     """
     Load stored video details and transcripts.
     
@@ -212,25 +396,40 @@ def load_video_details(topic: str = None, timestamp: str = None, base_path: str
         topic: Optional topic to load specific data
         timestamp: Optional timestamp to load specific version
         base_path: Base directory for data storage
+        columns: Optional subset of columns to read (only Parquet skips the others on disk)
     
     Returns:
         pd.DataFrame: Loaded video details
     """
-    import glob
-    
-    # Find latest data if topic/timestamp not specified
+    # Find latest data (for the topic, if given) when no timestamp is specified
     if not (topic and timestamp):
-        pattern = f"{base_path}/raw_data/*.csv"
-        files = glob.glob(pattern)
+        # - files are named {topic}_{YYYYmmdd}_{HHMMSS}.ext, so the topic is everything before the last two parts
+        formatted_topic = topic.lower().replace(' ', '_') if topic else None
+        # - one scandir pass; the entries carry their own stat results
+        try:
+            with os.scandir(f"{base_path}/raw_data") as entries:
+                files = [
+                    entry for entry in entries
+                    if entry.is_file() and entry.name.endswith(('.parquet', '.csv'))
+                    and (formatted_topic is None or '_'.join(os.path.splitext(entry.name)[0].split('_')[:-2]) == formatted_topic)
+                ]
+        except FileNotFoundError:
+            files = []
         if not files:
-            raise FileNotFoundError("No stored video data found")
-        raw_path = max(files)  # Get most recent
+            raise FileNotFoundError(f"No stored video data found{f' for topic {topic!r}' if topic else ''}")
+        raw_path = max(files, key=lambda entry: entry.stat(follow_symlinks=False).st_mtime).path  # Get most recent
     else:
         formatted_topic = topic.lower().replace(' ', '_')
-        raw_path = f"{base_path}/raw_data/{formatted_topic}_{timestamp}.csv"
+        raw_path = f"{base_path}/raw_data/{formatted_topic}_{timestamp}.parquet"
+        # - datasets stored before the Parquet switch are still CSV
+        if not os.path.exists(raw_path):
+            raw_path = raw_path[:-len('.parquet')] + '.csv'
     
     # Load data
-    video_df = pd.read_csv(raw_path)
+    if raw_path.endswith('.parquet'):
+        video_df = pd.read_parquet(raw_path, engine='pyarrow', columns=columns)
+    else:
+        video_df = pd.read_csv(raw_path, usecols=columns)
     print(f"Loaded video details from: {raw_path}")
     print(f"Found {len(video_df)} videos")
     